@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict, List, Mapping
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Union
 
 from chaoslib.types import Configuration
 from logzero import logger
@@ -26,6 +27,38 @@ __all__ = [
 ]
 
 
+@lru_cache(maxsize=8)
+def _get_driver(url: str, timeout: int) -> Wiremock:
+    """returns a driver shared by all actions targeting the same wiremock
+    server, so its connection pool survives across actions"""
+    return Wiremock(url=url, timeout=timeout)
+
+
+def _filter_mappings(
+    w: Wiremock, filter: List[Mapping], filter_opts: Dict[str, Any] = None
+) -> List[Mapping]:
+    """matches every filter against a single retrieval of the mappings
+    returns the matching mappings, each one listed once
+    raises ValueError on an empty filter, which would match every mapping
+    """
+    if not all(filter):
+        raise ValueError("Empty mappings filter")
+
+    filter_opts = filter_opts or {}
+    all_mappings = w.mappings()
+
+    matched: Dict[str, Mapping] = {}
+    for f in filter:
+        mappings = w.filter_mappings(f, mappings=all_mappings, **filter_opts)
+        if not mappings:
+            logger.error("No mapping match found for filter %s", f)
+            continue
+
+        for mapping in mappings:
+            matched.setdefault(mapping["id"], mapping)
+    return list(matched.values())
+
+
 def add_mappings(
     mappings: List[Any], configuration: Configuration = None
 ) -> List[Any]:
@@ -36,7 +69,7 @@ def add_mappings(
         return []
 
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
     return w.populate(mappings)
 
 
@@ -50,7 +83,7 @@ def populate_from_dir(
         return []
 
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
     return w.populate_from_dir(dir)
 
 
@@ -65,21 +98,13 @@ def delete_mappings(
     if not check_configuration(configuration):
         return []
 
-    filter_opts = filter_opts or {}
-
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
-
-    ids = []
-    for f in filter:
-        mappings = w.filter_mappings(f, **filter_opts)
-        if not mappings:
-            logger.error("No mapping match found for filter %s", f)
-            continue
+    w = _get_driver(params["url"], params["timeout"])
 
-        for mapping in mappings:
-            ids.append(w.delete_mapping(mapping["id"]))
-    return ids
+    return [
+        w.delete_mapping(mapping["id"])
+        for mapping in _filter_mappings(w, filter, filter_opts)
+    ]
 
 
 def delete_all_mappings(configuration: Configuration = None) -> bool:
@@ -90,13 +115,13 @@ def delete_all_mappings(configuration: Configuration = None) -> bool:
         return False
 
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
     return w.delete_all_mappings()
 
 
 def update_mappings_status_code_and_body(
     filter: List[Mapping],
-    status_code: str,
+    status_code: Union[int, str],
     body: str = None,
     body_file_name: str = None,
     filter_opts: Dict[str, Any] = None,
@@ -104,7 +129,7 @@ def update_mappings_status_code_and_body(
 ) -> List[Any]:
     """changes all Wiremock mappings responses to the set status_code and body.
     :param filter: the mappings filter
-    :param status_code: the new http status code
+    :param status_code: the new http status code, as an int or a string
     :param body: (optional) the response body as a string
     :param body_file_name: (optional) the response body as a file
     returns the list of ids of the mappings changed
@@ -115,15 +140,10 @@ def update_mappings_status_code_and_body(
     if not status_code:
         return []
 
-    filter_opts = filter_opts or {}
-
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
-
-    mappings_to_update: List[Mapping] = []
-    for f in filter:
-        mappings_to_update.extend(w.filter_mappings(f, **filter_opts))
+    w = _get_driver(params["url"], params["timeout"])
 
+    mappings_to_update = _filter_mappings(w, filter, filter_opts)
     if len(mappings_to_update) > 0:
         return w.update_status_code_and_body(
             mappings_to_update,
@@ -151,18 +171,9 @@ Default is True
     :return: a list of updated mappings
     """
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
-
-    filter_opts = filter_opts or {}
-
-    mappings_to_update: List[Any] = []
-    for f in filter:
-        mappings = w.filter_mappings(f, **filter_opts)
-        if mappings:
-            mappings_to_update.extend(mappings)
-        else:
-            logger.error("No mappings found")
+    w = _get_driver(params["url"], params["timeout"])
 
+    mappings_to_update = _filter_mappings(w, filter, filter_opts)
     if len(mappings_to_update) > 0:
         return w.update_fault(mappings_to_update, fault)
 
@@ -178,7 +189,7 @@ def down(
     Returns the list of delayed mappings
     """
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
 
     conf = configuration.get("wiremock", {})
     if "defaults" not in conf:
@@ -190,11 +201,7 @@ def down(
         logger.error("Down defaults not specified in config")
         return []
 
-    delayed = []
-    for f in filter:
-        delayed.append(w.chunked_dribble_delay(f, defaults["down"]))
-
-    return delayed
+    return w.chunked_dribble_delays(filter, defaults["down"])
 
 
 def global_fixed_delay(
@@ -202,7 +209,7 @@ def global_fixed_delay(
 ) -> int:
     """add a fixed delay to all mappings"""
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
     return w.global_fixed_delay(fixedDelay)
 
 
@@ -211,7 +218,7 @@ def global_random_delay(
 ) -> int:
     """adds a random delay to all mappings"""
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
     return w.global_random_delay(delayDistribution)
 
 
@@ -223,18 +230,9 @@ def fixed_delay(
 ) -> List[Any]:
     """adds a fixed delay to a list of mappings"""
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
-
-    filter_opts = filter_opts or {}
-
-    mappings_to_update: List[Any] = []
-    for f in filter:
-        mappings = w.filter_mappings(f, **filter_opts)
-        if mappings:
-            mappings_to_update.extend(mappings)
-        else:
-            logger.error("No mappings found")
+    w = _get_driver(params["url"], params["timeout"])
 
+    mappings_to_update = _filter_mappings(w, filter, filter_opts)
     if len(mappings_to_update) > 0:
         return w.fixed_delay(mappings_to_update, fixedDelayMilliseconds)
 
@@ -248,13 +246,9 @@ def random_delay(
 ) -> List[Any]:
     """adds a random delay to a list of mapppings"""
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
-
-    updated = []
-    for f in filter:
-        updated.append(w.random_delay(f, delayDistribution))
+    w = _get_driver(params["url"], params["timeout"])
 
-    return updated
+    return w.random_delays(filter, delayDistribution)
 
 
 def chunked_dribble_delay(
@@ -264,19 +258,15 @@ def chunked_dribble_delay(
 ) -> List[Any]:
     """adds a chunked dribble delay to a list of mappings"""
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
-
-    updated = []
-    for f in filter:
-        updated.append(w.chunked_dribble_delay(f, chunkedDribbleDelay))
+    w = _get_driver(params["url"], params["timeout"])
 
-    return updated
+    return w.chunked_dribble_delays(filter, chunkedDribbleDelay)
 
 
 def up(filter: List[Any], configuration: Configuration = None) -> List[Any]:
     """deletes all delays connected with a list of mappings"""
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
 
     return w.up(filter)
 
@@ -284,7 +274,7 @@ def up(filter: List[Any], configuration: Configuration = None) -> List[Any]:
 def reset(configuration: Configuration = None) -> int:
     """resets the wiremock server: deletes all mappings!"""
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
 
     return w.reset()
 
@@ -292,6 +282,6 @@ def reset(configuration: Configuration = None) -> int:
 def reset_mappings(configuration: Configuration = None) -> int:
     """resets the wiremock server: deletes all in-memory mappings!"""
     params = get_wm_params(configuration)
-    w = Wiremock(url=params["url"], timeout=params["timeout"])
+    w = _get_driver(params["url"], params["timeout"])
 
     return w.reset_mappings()
@@ -8,22 +8,132 @@ validation of the payloads.
 
 """
 
-import glob
 import json
 import os
-from typing import Any, Dict, List, Mapping, Optional
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from logzero import logger
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .utils import can_connect_to
 
-AVAILABLE_FAULTS = [
-    "EMPTY_RESPONSE",
-    "MALFORMED_RESPONSE_CHUNK",
-    "RANDOM_DATA_THEN_CLOSE",
-    "CONNECTION_RESET_BY_PEER",
-]
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+AVAILABLE_FAULTS = frozenset(
+    {
+        "EMPTY_RESPONSE",
+        "MALFORMED_RESPONSE_CHUNK",
+        "RANDOM_DATA_THEN_CLOSE",
+        "CONNECTION_RESET_BY_PEER",
+    }
+)
+
+# headers sent with every admin request, shared by all drivers
+_HEADERS = MappingProxyType(
+    {
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
+)
+
+# valid range for response status codes
+_STATUS_MIN, _STATUS_MAX = 100, 599
+
+# response attributes holding the delays removed by up
+_DELAY_KEYS = (
+    "fixedDelayMilliseconds",
+    "delayDistribution",
+    "chunkedDribbleDelay",
+)
+
+# request attributes cheap to compare, checked before nested matchers
+_CHEAP_KEYS = ("method", "url", "urlPath", "urlPattern", "urlPathPattern")
+
+
+def _read_mapping_file(filename: str) -> Any:
+    """loads a json mapping file"""
+    with open(filename, "rb") as file:
+        return _loads(file.read())
+
+
+def _filter_items(_filter: Mapping) -> List[Any]:
+    """filter items ordered so that cheap scalar keys are compared first,
+    keeping the filter order otherwise"""
+    return sorted(_filter.items(), key=lambda item: item[0] not in _CHEAP_KEYS)
+
+
+def _ordered_filter(_filter: Mapping) -> Dict[str, Any]:
+    """copy of the filter, nested filters included, whose keys iterate
+    cheap scalar keys first. Built once per filter, not per mapping"""
+    return {
+        key: _ordered_filter(value) if isinstance(value, Mapping) else value
+        for key, value in _filter_items(_filter)
+    }
+
+
+@dataclass(frozen=True)
+class _WiremockURLs:
+    """admin API endpoints of a wiremock server"""
+
+    base_url: str
+    mappings_url: str
+    import_url: str
+    settings_url: str
+    reset_url: str
+    reset_mappings_url: str
+
+
+@lru_cache(maxsize=32)
+def _admin_urls(url: str) -> _WiremockURLs:
+    """builds (once per server url) the admin API endpoints"""
+    base_url = f"{url}/__admin"
+    mappings_url = f"{base_url}/mappings"
+    return _WiremockURLs(
+        base_url=base_url,
+        mappings_url=mappings_url,
+        import_url=f"{mappings_url}/import",
+        settings_url=f"{base_url}/settings",
+        reset_url=f"{base_url}/reset",
+        reset_mappings_url=f"{mappings_url}/reset",
+    )
+
+
+class _MappingsCache(NamedTuple):
+    """mappings retrieved together with their request index, swapped as a
+    whole so that concurrent readers never mix two retrievals"""
+
+    timestamp: float
+    mappings: List[Dict[str, Any]]
+    index: Dict[str, Dict[str, Any]]
 
 
 class ConnectionError(Exception):
@@ -31,56 +141,133 @@ class ConnectionError(Exception):
 
 
 class Wiremock:
-    """driver class to interface with the wiremock admin API"""
+    """driver class to interface with the wiremock admin API
+    every admin call accepts a timeout overriding the driver one"""
 
     def __init__(
         self,
         host: str = None,
         port: str = None,
         url: str = None,
-        timeout: int = 1,
+        timeout: float = 5,
+        max_concurrency: int = 8,
+        mappings_ttl: float = 1.0,
     ):
 
         if host and port:
             url = f"http://{host}:{port}"
-        self.base_url = f"{url}/__admin"
-        self.mappings_url = f"{self.base_url}/mappings"
-        self.settings_url = f"{self.base_url}/settings"
-        self.reset_url = f"{self.base_url}/reset"
-        self.reset_mappings_url = f"{self.mappings_url}/reset"
+        urls = _admin_urls(url)
+        self.base_url = urls.base_url
+        self.mappings_url = urls.mappings_url
+        self.import_url = urls.import_url
+        self.settings_url = urls.settings_url
+        self.reset_url = urls.reset_url
+        self.reset_mappings_url = urls.reset_mappings_url
         self.timeout = timeout
-        self.headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-        }
+        self.max_concurrency = max_concurrency
+        self._mappings_cache: Optional[_MappingsCache] = None
+        self._mappings_ttl = mappings_ttl
+        # kept for backward compatibility: requests get them from the session
+        self.headers = _HEADERS
+
+        # a single pooled session lets consecutive admin calls reuse
+        # keep-alive connections instead of reconnecting every time
+        self.session = requests.Session()
+        # transient gateway errors are retried with a short backoff
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.1,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({"GET", "POST", "PUT", "DELETE"}),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
 
-        if (host and port) and can_connect_to(host, port) is False:
+        if (host and port) and not can_connect_to(host, port):
             raise ConnectionError("Wiremock server not found")
 
-    def mappings(self) -> List[Any]:
+    def concurrent_map(
+        self, func: Callable[[Any], Any], items: Iterable[Any]
+    ) -> List[Any]:
+        """calls func on each item, running at most max_concurrency
+        admin requests at once
+        Returns the results in the same order as items"""
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            return [func(item) for item in items]
+
+        workers = min(self.max_concurrency, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+
+    def _invalidate_mappings_cache(self):
+        """drops the cached mappings list after a mutating call"""
+        self._mappings_cache = None
+
+    @staticmethod
+    def _request_key(request: Mapping[str, Any]) -> str:
+        """canonical form of a mapping request, used as index key"""
+        return json.dumps(request, sort_keys=True)
+
+    def mappings(self, timeout: float = None) -> List[Any]:
         """
         retrieves all mappings
         returns the array of mappings found
+        (served from a short lived cache, invalidated on every change:
+        the returned mappings are shared until then, callers changing
+        them must write them back through the driver)
         """
-        response = requests.get(
-            self.mappings_url, headers=self.headers, timeout=self.timeout
+        return self._indexed_mappings(timeout)[0]
+
+    def _indexed_mappings(
+        self, timeout: float = None
+    ) -> Tuple[List[Any], Dict[str, Dict[str, Any]]]:
+        """retrieves all mappings along with the index of the same
+        retrieval, keyed by canonical request"""
+        cache = self._mappings_cache
+        if (
+            cache is not None
+            and time.monotonic() - cache.timestamp < self._mappings_ttl
+        ):
+            return cache.mappings, cache.index
+
+        response = self.session.get(
+            self.mappings_url, timeout=timeout or self.timeout
         )
         if response.status_code != 200:
             logger.error(
                 "[mappings]:Error retrieving mappings: %s", response.text
             )
-            return []
-
-        res = response.json()
-        return res["mappings"]
+            self._invalidate_mappings_cache()
+            return [], {}
+
+        # an unchanged payload is parsed again on purpose: the cached
+        # mappings are handed out and may have been changed by callers,
+        # and copying them costs more than parsing
+        mappings = _loads(response.content)["mappings"]
+        index = {}
+        for mapping in mappings:
+            index.setdefault(
+                self._request_key(mapping.get("request")), mapping
+            )
+        self._mappings_cache = _MappingsCache(
+            time.monotonic(), mappings, index
+        )
+        return mappings, index
 
-    def mapping_by_id(self, stub_id=int) -> Dict[str, Any]:
+    def mapping_by_id(
+        self, stub_id=int, timeout: float = None
+    ) -> Dict[str, Any]:
         """retrieve the stub mapping configuration from wiremock with
         with the given id"""
-        response = requests.get(
-            f"{self.mappings_url}/{stub_id}",
-            headers=self.headers,
-            timeout=self.timeout,
+        response = self.session.get(
+            f"{self.mappings_url}/{stub_id}", timeout=timeout or self.timeout
         )
         if response.status_code != 200:
             logger.error(
@@ -97,11 +284,19 @@ class Wiremock:
         return matching_mappings[1] if len(matching_mappings) > 0 else None
 
     def filter_mappings(
-        self, _filter: Mapping, strict: bool = True, limit: int = 0
+        self,
+        _filter: Mapping,
+        strict: bool = True,
+        limit: int = 0,
+        mappings: List[Mapping] = None,
+        timeout: float = None,
     ) -> List[Mapping]:
-        """search for matching stub mappings in wiremock
+        """search for matching stub mappings in wiremock, or in the passed
+        list of already retrieved mappings
         Returns a list of matchimg mappings"""
-        mappings = self.mappings()
+        if mappings is None:
+            mappings = self.mappings(timeout=timeout)
+        _filter = _ordered_filter(_filter)
 
         matching_mappings = []
         count = 0
@@ -124,13 +319,10 @@ class Wiremock:
     def strict_filter(self, node: Mapping, _filter: Mapping) -> bool:
         """(legacy) match mappings metadata with builtin equality comparison
         Returns True if mapping matches the filter, False otherwise."""
-        intersec = node.keys() & _filter.keys()
-        if len(intersec) != len(_filter.keys()):
+        if not _filter.keys() <= node.keys():
             return False
-        for key in _filter.keys():
-            filter_value = _filter[key]
-            comp = node.get(key)
-            if filter_value != comp:
+        for key, filter_value in _filter.items():
+            if node.get(key) != filter_value:
                 return False
         return True
 
@@ -140,11 +332,9 @@ class Wiremock:
         """match mappings metadata by recursively comparing node by node
         with the stub mapping.
         Returns True if mapping matches the filter, False otherwise."""
-        intersec = node.keys() & _filter.keys()
-        if len(intersec) != len(_filter.keys()):
+        if not _filter.keys() <= node.keys():
             return False
-        for key in _filter.keys():
-            filter_value = _filter[key]
+        for key, filter_value in _filter.items():
             comp = node.get(key)
             if isinstance(filter_value, Mapping):
                 if not self.recursive_filter(
@@ -160,63 +350,153 @@ class Wiremock:
         return True
 
     def mapping_by_request_exact_match(
-        self, request: Mapping[str, Any] = None
+        self, request: Mapping[str, Any] = None, timeout: float = None
     ) -> Dict[str, Any]:
         """match mappings in wiremock using an exact match
         on the request metadata"""
-        mappings = self.mappings()
+        mappings, index = self._indexed_mappings(timeout)
+        try:
+            mapping = index.get(self._request_key(request))
+        except TypeError:
+            mapping = None
+        if mapping is not None:
+            return mapping
+
+        # requests equal but serialized differently (1 and 1.0, True and 1)
+        # miss the index
         for mapping in mappings:
             if mapping["request"] == request:
                 return mapping
         return None
 
-    def populate(self, mappings: Mapping[str, Any]) -> List[Any]:
+    def populate(
+        self, mappings: Mapping[str, Any], timeout: float = None
+    ) -> List[Any]:
         """Populate: adds all passed mappings
+        as with a single add, a mapping carrying the id of an existing stub
+        replaces it, whatever the number of mappings passed
         Returns the list of ids of mappings created
         """
-        if isinstance(mappings, list) is False:
+        if not isinstance(mappings, list):
             logger.error("[populate]:ERROR: mappings should be a list")
             return None
 
-        ids = []
-        for mapping in mappings:
-            stub_id = self.add_mapping(mapping)
-            if stub_id is not None:
-                ids.append(stub_id)
-            else:
-                logger.error("[populate]:ERROR adding a mapping")
-                return None
+        if len(mappings) > 1:
+            return self.populate_batch(mappings, timeout=timeout)
+        if not mappings:
+            return []
 
-        return ids
+        stub_id = self.add_mapping(mappings[0], timeout=timeout)
+        if stub_id is None:
+            logger.error("[populate]:ERROR adding a mapping")
+            return None
+
+        return [stub_id]
+
+    def populate_batch(
+        self,
+        mappings: List[Mapping[str, Any]],
+        duplicate_policy: str = "OVERWRITE",
+        timeout: float = None,
+    ) -> Optional[List[Any]]:
+        """adds all passed mappings with a single call to the import
+        endpoint. Mappings without an id get a new one, mappings with an
+        already existing id are handled according to duplicate_policy.
+        As with one add per mapping, the last mapping wins when stubs
+        overlap
+        Returns the list of ids of mappings imported
+        or None in case of errors
+        """
+        self._invalidate_mappings_cache()
+        stubs = [
+            (
+                mapping
+                if "id" in mapping or "uuid" in mapping
+                else dict(mapping, id=str(uuid.uuid4()))
+            )
+            for mapping in mappings
+        ]
+        response = self.session.post(
+            self.import_url,
+            # wiremock imports the array in reverse order
+            data=_dumps(
+                {
+                    "mappings": list(reversed(stubs)),
+                    "importOptions": {"duplicatePolicy": duplicate_policy},
+                }
+            ),
+            timeout=timeout or self.timeout,
+        )
+        if response.status_code != 200:
+            logger.error(
+                "[populate_batch]:Error importing mappings: %s", response.text
+            )
+            return None
+
+        return [stub.get("id", stub.get("uuid")) for stub in stubs]
 
-    def populate_from_dir(self, _dir: str) -> List[Any]:
-        """reads all json files in a directory and adds all mappings
+    def populate_from_dir(
+        self, _dir: str, max_in_flight: int = 64, timeout: float = None
+    ) -> List[Any]:
+        """reads all json files in a directory and adds all mappings,
+        reading files in parallel and importing them in batches of at
+        most max_in_flight mappings
         Returns the list of ids of mappings created
         or None in case of errors
         """
-        if not os.path.exists(_dir):
+        if not os.path.isdir(_dir):
             logger.error(
                 "[populate_from_dir]: directory %s does not exists", _dir
             )
             return None
 
+        with os.scandir(_dir) as entries:
+            filenames = sorted(
+                entry.path
+                for entry in entries
+                if entry.name.endswith(".json")
+                and not entry.name.startswith(".")
+                and entry.is_file()
+            )
+
+        max_in_flight = max(max_in_flight, 1)
+        workers = min(32, (os.cpu_count() or 1) * 4)
         ids = []
-        for filename in glob.glob(os.path.join(_dir, "*.json")):
-            logger.info("Importing %s", filename)
-            with open(filename, encoding="utf-8") as file:
-                mapping = json.load(file)
-                stub_id = self.add_mapping(mapping)
-                if stub_id is not None:
-                    ids.append(stub_id)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(filenames), max_in_flight):
+                end = start + max_in_flight
+                mappings = list(
+                    executor.map(_read_mapping_file, filenames[start:end])
+                )
+                batch_ids = self.populate_batch(mappings, timeout=timeout)
+                if batch_ids is None:
+                    # one bad mapping fails the whole import: add them one
+                    # by one so that only the bad ones are skipped
+                    logger.error(
+                        "[populate_from_dir]: Error importing %d mappings, "
+                        "adding them one by one",
+                        len(mappings),
+                    )
+                    batch_ids = [
+                        stub_id
+                        for stub_id in self.concurrent_map(
+                            lambda m: self.add_mapping(m, timeout=timeout),
+                            mappings,
+                        )
+                        if stub_id is not None
+                    ]
+                ids.extend(batch_ids)
+
+        logger.info("Imported %d mappings from %s", len(ids), _dir)
         return ids
 
     def update_fault(
-        self, mappings: Mapping[str, Any], fault: str
+        self, mappings: Mapping[str, Any], fault: str, timeout: float = None
     ) -> Optional[List[Any]]:
         """
         Updates fault status of stub mappings
         """
-        if isinstance(mappings, list) is False:
+        if not isinstance(mappings, list):
             logger.error("[update_fault] mappings parameter should be a list")
             return None
 
@@ -224,74 +504,77 @@ class Wiremock:
             logger.error("[update_fault] fault %s not available.", fault)
             return None
 
-        ids = []
-        for mapping in mappings:
-            stub_id = mapping["id"]
+        def _update(mapping: Dict[str, Any]) -> Optional[str]:
             mapping["response"]["fault"] = fault
+            if self.update_mapping(mapping["id"], mapping, timeout=timeout):
+                return mapping["id"]
+            return None
 
-            if self.update_mapping(stub_id, mapping):
-                ids.append(stub_id)
-            else:
-                logger.error(
-                    "[populate]:ERROR updating a mapping with new fault"
-                )
-                return None
+        ids = self.concurrent_map(_update, mappings)
+        if None in ids:
+            logger.error("[populate]:ERROR updating a mapping with new fault")
+            return None
         return ids
 
     def update_status_code_and_body(
         self,
         mappings: Mapping[str, Any],
-        status_code: str,
+        status_code: Union[int, str],
         body: str = None,
         body_file_name: str = None,
+        timeout: float = None,
     ) -> List[Any]:
         """Populate: adds all passed mappings
+        status_code may be passed either as an int or as a string,
+        it is always written as an int
         Returns the list of ids of mappings created
         """
-        if isinstance(mappings, list) is False:
+        if not isinstance(mappings, list):
             logger.error("[populate]:ERROR: mappings should be a list")
             return None
 
         try:
             status_code_number = int(status_code)
-            if status_code_number < 100 or status_code_number > 599:
-                logger.error(
-                    "ERROR: incorrect http status code [%s]", str(status_code)
-                )
-                return None
-        except ValueError:
+        except (TypeError, ValueError):
             logger.error("ERROR: incorrect http status code [%s]", status_code)
             return None
+        if not _STATUS_MIN <= status_code_number <= _STATUS_MAX:
+            logger.error(
+                "ERROR: incorrect http status code [%s]", str(status_code)
+            )
+            return None
+
+        patch = {"status": status_code_number}
+        if body_file_name:
+            patch.update(bodyFileName=body_file_name, body=None)
+        elif body:
+            patch.update(bodyFileName=None, body=body)
 
-        ids = []
         for mapping in mappings:
-            stub_id = mapping["id"]
-            mapping["response"]["status"] = status_code
-            if body_file_name:
-                mapping["response"]["bodyFileName"] = body_file_name
-                mapping["response"]["body"] = None
-            elif body:
-                mapping["response"]["bodyFileName"] = None
-                mapping["response"]["body"] = body
-
-            if self.update_mapping(stub_id, mapping):
-                ids.append(stub_id)
-            else:
-                logger.error(
-                    "[populate]:ERROR updating a mapping with new status code"
-                )
-                return None
+            mapping["response"].update(patch)
+
+        ids = self.populate_batch(
+            mappings, duplicate_policy="OVERWRITE", timeout=timeout
+        )
+        if ids is None:
+            logger.error(
+                "[populate]:ERROR updating a mapping with new status code"
+            )
+            return None
         return ids
 
     def update_mapping(
-        self, mapping_id: str = "", mapping: Mapping[str, Any] = None
+        self,
+        mapping_id: str = "",
+        mapping: Mapping[str, Any] = None,
+        timeout: float = None,
     ) -> Dict[str, Any]:
         """updates the mapping pointed by id with new mapping"""
-        response = requests.put(
+        self._invalidate_mappings_cache()
+        response = self.session.put(
             f"{self.mappings_url}/{mapping_id}",
-            headers=self.headers,
-            data=json.dumps(mapping),
-            timeout=self.timeout,
+            data=_dumps(mapping),
+            timeout=timeout or self.timeout,
         )
         if response.status_code != 200:
             logger.error("Error updating a mapping: %s", response.text)
@@ -299,13 +582,19 @@ class Wiremock:
 
         return response.json()
 
-    def add_mapping(self, mapping: Mapping[str, Any]) -> int:
-        """add_mapping: add a mapping passed as attribute"""
-        response = requests.post(
+    def add_mapping(
+        self, mapping: Mapping[str, Any], timeout: float = None
+    ) -> int:
+        """add_mapping: add a mapping passed as attribute
+        mappings without an id get a new one, so that a retried request
+        cannot create the same stub twice"""
+        self._invalidate_mappings_cache()
+        if "id" not in mapping and "uuid" not in mapping:
+            mapping = dict(mapping, id=str(uuid.uuid4()))
+        response = self.session.post(
             self.mappings_url,
-            headers=self.headers,
-            data=json.dumps(mapping),
-            timeout=self.timeout,
+            data=_dumps(mapping),
+            timeout=timeout or self.timeout,
         )
         if response.status_code != 201:
             logger.error("Error creating a mapping: %s", response.text)
@@ -314,10 +603,11 @@ class Wiremock:
         response_data = response.json()
         return response_data["id"]
 
-    def delete_mapping(self, stub_id: str):
+    def delete_mapping(self, stub_id: str, timeout: float = None):
         """remove a mapping from wiremock with the requested id"""
-        response = requests.delete(
-            f"{self.mappings_url}/{stub_id}", timeout=self.timeout
+        self._invalidate_mappings_cache()
+        response = self.session.delete(
+            f"{self.mappings_url}/{stub_id}", timeout=timeout or self.timeout
         )
         if response.status_code != 200:
             logger.error(
@@ -327,50 +617,56 @@ class Wiremock:
 
         return stub_id
 
-    def delete_all_mappings(self):
+    def delete_all_mappings(self, timeout: float = None):
         """deletes all mappings defined in wiremock
         returns the list of deleted mappings"""
-        mappings = self.mappings()
+        self._invalidate_mappings_cache()
+        mappings = self.mappings(timeout=timeout)
         ids = []
         for mapping in mappings:
             stub_id = mapping["id"]
-            response = requests.delete(
-                f"{self.mappings_url}/{stub_id}", timeout=self.timeout
+            response = self.session.delete(
+                f"{self.mappings_url}/{stub_id}",
+                timeout=timeout or self.timeout,
             )
             if response.status_code == 200:
                 ids.append(stub_id)
             else:
                 logger.error("Error deleting all mapping")
 
+        self._invalidate_mappings_cache()
         return ids
 
     def fixed_delay(
         self,
         mappings: List[Mapping[str, Any]],
         fixed_delay_milliseconds: int = 0,
+        timeout: float = None,
     ) -> Dict:
         """
         updates the mappings adding a fixed delay
         returns the a list of updated mappings or none in case of errors
         """
-        updated_ids = []
-        for mapping in mappings:
+
+        def _update(mapping: Dict[str, Any]) -> Optional[str]:
             m_response = mapping["response"]
             m_response["fixedDelayMilliseconds"] = fixed_delay_milliseconds
             m_response["delayDistribution"] = None
-            result = self.update_mapping(mapping["id"], mapping)
-            if result:
-                updated_ids.append(mapping["id"])
+            if self.update_mapping(mapping["id"], mapping, timeout=timeout):
+                return mapping["id"]
+            return None
 
-        return updated_ids
+        updated_ids = self.concurrent_map(_update, mappings)
+        return [stub_id for stub_id in updated_ids if stub_id is not None]
 
-    def global_fixed_delay(self, fixed_delay: int) -> int:
+    def global_fixed_delay(
+        self, fixed_delay: int, timeout: float = None
+    ) -> int:
         """set a global fixed delay for all wiremock mappings"""
-        response = requests.post(
+        response = self.session.post(
             self.settings_url,
-            headers=self.headers,
-            data=json.dumps({"fixedDelay": fixed_delay}),
-            timeout=self.timeout,
+            data=_dumps({"fixedDelay": fixed_delay}),
+            timeout=timeout or self.timeout,
         )
         if response.status_code != 200:
             logger.error(
@@ -382,37 +678,49 @@ class Wiremock:
         return 1
 
     def random_delay(
-        self, _filter: Mapping[str, Any], delay_distribution: Mapping[str, Any]
+        self,
+        _filter: Mapping[str, Any],
+        delay_distribution: Mapping[str, Any],
+        timeout: float = None,
     ) -> Dict[str, Any]:
         """
         Updates the mapping adding a random delay
         returns the updated mapping or none in case of errors
         """
+        return self.random_delays([_filter], delay_distribution, timeout)[0]
+
+    def random_delays(
+        self,
+        filters: List[Mapping[str, Any]],
+        delay_distribution: Mapping[str, Any],
+        timeout: float = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Updates the mappings matching each filter adding a random delay
+        returns the updated mappings, with None for each filter in error
+        """
         if not isinstance(delay_distribution, dict):
             logger.error("[random_delay]: parameter has to be a dictionary")
 
-        mapping_found = self.mapping_by_request_exact_match(_filter)
-
-        if not mapping_found:
-            logger.error("[random_delay]: Error retrieving mapping")
-            return None
-
-        mapping_found["response"]["delayDistribution"] = delay_distribution
-        return self.update_mapping(mapping_found["id"], mapping_found)
+        return self._update_responses(
+            filters,
+            {"delayDistribution": delay_distribution},
+            "random_delay",
+            timeout,
+        )
 
     def global_random_delay(
-        self, delay_distribution: Mapping[str, Any]
+        self, delay_distribution: Mapping[str, Any], timeout: float = None
     ) -> int:
         """set a global random delay for all wiremock mappings"""
         if not isinstance(delay_distribution, dict):
             logger.error(
                 "[global_random_delay]: parameter has to be a dictionary"
             )
-        response = requests.post(
+        response = self.session.post(
             self.settings_url,
-            headers=self.headers,
-            data=json.dumps({"delayDistribution": delay_distribution}),
-            timeout=self.timeout,
+            data=_dumps({"delayDistribution": delay_distribution}),
+            timeout=timeout or self.timeout,
         )
         if response.status_code != 200:
             logger.error(
@@ -427,11 +735,27 @@ class Wiremock:
         self,
         _filter: List[Any],
         chunked_dribble_delay: Mapping[str, Any] = None,
+        timeout: float = None,
     ):
         """
         Adds a delay to the passed mapping
         returns the updated mapping or non in case of errors
         """
+        delayed = self.chunked_dribble_delays(
+            [_filter], chunked_dribble_delay, timeout
+        )
+        return delayed[0]
+
+    def chunked_dribble_delays(
+        self,
+        filters: List[Mapping[str, Any]],
+        chunked_dribble_delay: Mapping[str, Any] = None,
+        timeout: float = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Adds a delay to the mappings matching each filter
+        returns the updated mappings, with None for each filter in error
+        """
         if not isinstance(chunked_dribble_delay, dict):
             logger.error(
                 "[chunked_dribble_delay]: parameter has to be a dictionary"
@@ -441,47 +765,80 @@ class Wiremock:
                 "[chunked_dribble_delay]: attribute numberOfChunks not "
                 "found in parameter"
             )
-            return None
+            return [None] * len(filters)
         if "totalDuration" not in chunked_dribble_delay:
             logger.error(
                 "[chunked_dribble_delay]: attribute totalDuration not found "
                 "in parameter"
             )
-            return None
+            return [None] * len(filters)
 
-        mapping_found = self.mapping_by_request_exact_match(_filter)
+        return self._update_responses(
+            filters,
+            {"chunkedDribbleDelay": chunked_dribble_delay},
+            "chunked_dribble_delay",
+            timeout,
+        )
 
-        if not mapping_found:
-            logger.error("[chunked_dribble_delay]: Error retrieving mapping")
-            return None
+    def _update_responses(
+        self,
+        filters: List[Mapping[str, Any]],
+        patch: Mapping[str, Any],
+        caller: str,
+        timeout: float = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """merges patch into the response of the mapping exactly matching
+        each filter. All lookups are served by one mappings retrieval
+        before the updates are sent concurrently
+        returns the updated mappings, with None for each filter in error
+        """
+        mappings_found = [
+            self.mapping_by_request_exact_match(f, timeout=timeout)
+            for f in filters
+        ]
+
+        def _update(mapping: Optional[Dict[str, Any]]):
+            if not mapping:
+                logger.error("[%s]: Error retrieving mapping", caller)
+                return None
+            mapping["response"].update(patch)
+            return self.update_mapping(mapping["id"], mapping, timeout=timeout)
 
-        mapping_found["response"][
-            "chunkedDribbleDelay"
-        ] = chunked_dribble_delay
-        return self.update_mapping(mapping_found["id"], mapping_found)
+        return self.concurrent_map(_update, mappings_found)
 
-    def up(self, _filter: List[Any] = None) -> List[Any]:
-        """resets a list of mappings deleting all delays attached to them"""
+    def up(
+        self, _filter: List[Any] = None, timeout: float = None
+    ) -> List[Any]:
+        """resets a list of mappings deleting all delays attached to them
+        all lookups are served by one mappings retrieval and the delayed
+        mappings are written back with a single import call"""
         ids = []
-        for stub_filter in _filter:
-            mapping_found = self.mapping_by_request_exact_match(stub_filter)
+        delayed: Dict[str, Dict[str, Any]] = {}
+        for stub_filter in _filter or []:
+            mapping_found = self.mapping_by_request_exact_match(
+                stub_filter, timeout=timeout
+            )
             if mapping_found:
                 logger.debug("[up]: found mapping: %s", mapping_found["id"])
-                for key in [
-                    "fixedDelayMilliseconds",
-                    "delayDistribution",
-                    "chunkedDribbleDelay",
-                ]:
-                    if key in mapping_found["response"]:
-                        del mapping_found["response"][key]
-                self.update_mapping(mapping_found["id"], mapping_found)
+                response = mapping_found["response"]
+                for key in _DELAY_KEYS:
+                    if response.pop(key, None) is not None:
+                        delayed[mapping_found["id"]] = mapping_found
                 ids.append(mapping_found["id"])
+
+        if not delayed:
+            return ids
+        imported = self.populate_batch(list(delayed.values()), timeout=timeout)
+        if imported is None:
+            logger.error("[up]: Error removing delays from mappings")
+            return []
         return ids
 
-    def reset(self) -> int:
+    def reset(self, timeout: float = None) -> int:
         """reset global wiremock settings"""
-        response = requests.post(
-            self.reset_url, headers=self.headers, timeout=self.timeout
+        self._invalidate_mappings_cache()
+        response = self.session.post(
+            self.reset_url, timeout=timeout or self.timeout
         )
         if response.status_code != 200:
             logger.error(
@@ -491,10 +848,11 @@ class Wiremock:
 
         return 1
 
-    def reset_mappings(self) -> int:
+    def reset_mappings(self, timeout: float = None) -> int:
         """reload wiremock mappings from disk"""
-        response = requests.post(
-            self.reset_mappings_url, headers=self.headers, timeout=self.timeout
+        self._invalidate_mappings_cache()
+        response = self.session.post(
+            self.reset_mappings_url, timeout=timeout or self.timeout
         )
         if response.status_code != 200:
             logger.error(
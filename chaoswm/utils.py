@@ -22,7 +22,7 @@ def get_wm_params(configuration: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     host = wm_conf.get("host", None)
     port = wm_conf.get("port", None)
     context_path = wm_conf.get("contextPath", "")
-    timeout = wm_conf.get("timeout", 1)
+    timeout = wm_conf.get("timeout", 5)
 
     url = ""
 
@@ -4,7 +4,10 @@ import logging
 import unittest
 from http.client import HTTPConnection
 
+import requests_mock
+
 from chaoswm.actions import (
+    _get_driver,
     add_mappings,
     chunked_dribble_delay,
     delete_mappings,
@@ -396,3 +399,38 @@ class TestActions(unittest.TestCase):
 
         m = mappings({"wiremock": {"host": "localhost", "port": 8080}})
         self.assertTrue("chunkedDribbleDelay" not in m[0]["response"])
+
+
+class TestActionsOffline(unittest.TestCase):
+    @requests_mock.Mocker()
+    def test_empty_filter_raises(self, m):
+        m.get("http://wiremock/__admin/mappings", json={"mappings": []})
+        configuration = {"wiremock": {"url": "http://wiremock"}}
+        with self.assertRaises(ValueError):
+            fixed_delay(
+                filter=[{"url": "/some/thing"}, {}],
+                fixedDelayMilliseconds=100,
+                configuration=configuration,
+            )
+        with self.assertRaises(ValueError):
+            delete_mappings(filter=[{}], configuration=configuration)
+        self.assertFalse(m.called)
+
+    @requests_mock.Mocker()
+    def test_actions_share_driver(self, m):
+        m.post("http://wiremock/__admin/reset")
+        _get_driver.cache_clear()
+        configuration = {"wiremock": {"url": "http://wiremock"}}
+        reset(configuration=configuration)
+        reset(configuration=configuration)
+        info = _get_driver.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+        w = _get_driver("http://wiremock", 5)
+        self.assertIs(w, _get_driver("http://wiremock", 5))
+        self.assertIs(w.session, _get_driver("http://wiremock", 5).session)
+
+        other = _get_driver("http://wiremock", 1)
+        self.assertIsNot(other, w)
+        self.assertEqual(_get_driver.cache_info().currsize, 2)
+        self.assertEqual(m.call_count, 2)
@@ -1,5 +1,12 @@
+import json
+import os
+import tempfile
+import time
 import unittest
 from typing import List
+
+import requests_mock
+
 from chaoswm.driver import Wiremock
 from chaoswm.utils import can_connect_to
 
@@ -78,6 +85,24 @@ class TestWiremock(unittest.TestCase):
         self.assertTrue(isinstance(ids, list))
         self.assertEqual(len(ids), 2)
 
+    def test_populate_batch(self):
+        w = Wiremock(host="localhost", port=8080)
+        w.delete_all_mappings()
+        ids = w.populate_batch(
+            [
+                {
+                    "request": {"method": "GET", "url": "/some/thing"},
+                    "response": {"status": 200, "body": "Hello world!"},
+                },
+                {
+                    "request": {"method": "GET", "url": "/some/thing/else"},
+                    "response": {"status": 200, "body": "Hello again!"},
+                },
+            ]
+        )
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(sorted(m["id"] for m in w.mappings()), sorted(ids))
+
     def test_populate_from_dir(self):
         w = Wiremock(host="localhost", port=8080)
         w.delete_all_mappings()
@@ -118,6 +143,19 @@ class TestWiremock(unittest.TestCase):
         self.assertTrue(isinstance(mappings, list))
         self.assertEqual(len(mappings), 1)
 
+    def test_mappings_cache(self):
+        w = Wiremock(host="localhost", port=8080, mappings_ttl=60)
+        w.delete_all_mappings()
+        mappings = w.mappings()
+        self.assertIs(w.mappings(), mappings)
+        w.add_mapping(
+            {
+                "request": {"method": "GET", "url": "/some/cached/thing"},
+                "response": {"status": 200, "body": "Hello world!"},
+            }
+        )
+        self.assertEqual(len(w.mappings()), len(mappings) + 1)
+
     def test_mapping_by_id(self):
         w = Wiremock(host="localhost", port=8080)
         w.delete_all_mappings()
@@ -326,6 +364,32 @@ class TestWiremock(unittest.TestCase):
         self.assertTrue(isinstance(delayed["id"], str))
         self.assertEqual(delayed["id"], id)
 
+    def test_random_delays(self):
+        w = Wiremock(host="localhost", port=8080)
+        w.delete_all_mappings()
+        ids = w.populate(
+            [
+                {
+                    "request": {"method": "GET", "url": "/some/thing"},
+                    "response": {"status": 200, "body": "Hello world!"},
+                },
+                {
+                    "request": {"method": "GET", "url": "/some/thing/else"},
+                    "response": {"status": 200, "body": "Hello again!"},
+                },
+            ]
+        )
+        delayed = w.random_delays(
+            [
+                {"method": "GET", "url": "/some/thing"},
+                {"method": "GET", "url": "/some/thing/else"},
+                {"method": "GET", "url": "/not/found"},
+            ],
+            {"type": "lognormal", "median": 80, "sigma": 0.4},
+        )
+        self.assertEqual([d["id"] for d in delayed[:2]], ids)
+        self.assertIsNone(delayed[2])
+
     def test_global_random_delay(self):
         w = Wiremock(host="localhost", port=8080)
         ret = w.global_random_delay(
@@ -390,3 +454,285 @@ class TestWiremock(unittest.TestCase):
     def test_reset(self):
         w = Wiremock(host="localhost", port=8080)
         self.assertEqual(w.reset(), 1)
+
+
+WM_URL = "http://wiremock"
+ADMIN_URL = f"{WM_URL}/__admin"
+
+
+class TestWiremockOffline(unittest.TestCase):
+    def test_concurrent_map(self):
+        w = Wiremock(url=WM_URL, max_concurrency=4)
+        self.assertEqual(
+            w.concurrent_map(lambda x: x * 2, range(10)),
+            [x * 2 for x in range(10)],
+        )
+
+    @requests_mock.Mocker()
+    def test_concurrent_map_keeps_order(self, m):
+        def _slow_first(request, context):
+            # earlier items answer later, so they complete out of order
+            index = int(request.path.rsplit("/", 1)[-1])
+            time.sleep((8 - index) * 0.01)
+            return {"id": str(index)}
+
+        m.get(requests_mock.ANY, json=_slow_first)
+        w = Wiremock(url=WM_URL, max_concurrency=8)
+        results = w.concurrent_map(
+            lambda i: w.mapping_by_id(i)["id"], range(8)
+        )
+        self.assertEqual(results, [str(i) for i in range(8)])
+
+    @requests_mock.Mocker()
+    def test_populate_batch_payload(self, m):
+        m.post(f"{ADMIN_URL}/mappings/import", status_code=200)
+        w = Wiremock(url=WM_URL)
+        ids = w.populate_batch(
+            [
+                {"id": "known", "request": {"url": "/a"}},
+                {"request": {"url": "/b"}},
+            ],
+            duplicate_policy="IGNORE",
+        )
+
+        self.assertEqual(m.call_count, 1)
+        payload = json.loads(m.last_request.body)
+        self.assertEqual(
+            payload["importOptions"], {"duplicatePolicy": "IGNORE"}
+        )
+        self.assertEqual(ids[0], "known")
+        self.assertTrue(isinstance(ids[1], str))
+        # sent reversed, since wiremock imports the array in reverse order
+        self.assertEqual(
+            [stub["id"] for stub in payload["mappings"]], ids[::-1]
+        )
+
+    def _mock_stub_store(self, m, stubs):
+        """mocks the wiremock add and import endpoints over a stub dict"""
+
+        def _add(request, context):
+            mapping = request.json()
+            stubs[mapping["id"]] = mapping
+            context.status_code = 201
+            return mapping
+
+        def _import(request, context):
+            payload = request.json()
+            policy = payload["importOptions"]["duplicatePolicy"]
+            for mapping in payload["mappings"]:
+                if mapping["id"] not in stubs or policy == "OVERWRITE":
+                    stubs[mapping["id"]] = mapping
+            return ""
+
+        m.post(f"{ADMIN_URL}/mappings", json=_add)
+        m.post(f"{ADMIN_URL}/mappings/import", text=_import)
+
+    @requests_mock.Mocker()
+    def test_populate_replaces_existing_id(self, m):
+        existing = {"id": "known", "request": {"url": "/old"}}
+        edited = {"id": "known", "request": {"url": "/new"}}
+        other = {"id": "other", "request": {"url": "/other"}}
+
+        single = {"known": existing}
+        self._mock_stub_store(m, single)
+        w = Wiremock(url=WM_URL)
+        self.assertEqual(w.populate([edited]), ["known"])
+
+        batch = {"known": existing}
+        self._mock_stub_store(m, batch)
+        self.assertEqual(w.populate([edited, other]), ["known", "other"])
+
+        self.assertEqual(single["known"], edited)
+        self.assertEqual(batch["known"], single["known"])
+
+    @requests_mock.Mocker()
+    def test_populate_batch_error(self, m):
+        m.post(f"{ADMIN_URL}/mappings/import", status_code=422)
+        w = Wiremock(url=WM_URL)
+        self.assertIsNone(w.populate_batch([{"request": {"url": "/a"}}]))
+
+    @requests_mock.Mocker()
+    def test_populate_from_dir_skips_only_bad_mappings(self, m):
+        def _add(request, context):
+            mapping = json.loads(request.body)
+            if "request" not in mapping:
+                context.status_code = 422
+                return {"errors": []}
+            context.status_code = 201
+            return {"id": mapping["request"]["url"]}
+
+        m.post(f"{ADMIN_URL}/mappings/import", status_code=422)
+        m.post(f"{ADMIN_URL}/mappings", json=_add)
+        with tempfile.TemporaryDirectory() as _dir:
+            for name, mapping in (
+                ("good1.json", {"request": {"url": "/a"}}),
+                ("bad.json", {"response": {"status": 200}}),
+                ("good2.json", {"request": {"url": "/b"}}),
+            ):
+                with open(os.path.join(_dir, name), "w") as file:
+                    json.dump(mapping, file)
+
+            w = Wiremock(url=WM_URL)
+            ids = w.populate_from_dir(_dir)
+
+        self.assertEqual(len(ids), 2)
+
+    @requests_mock.Mocker()
+    def test_mapping_by_request_exact_match(self, m):
+        m.get(
+            f"{ADMIN_URL}/mappings",
+            json={
+                "mappings": [
+                    {"id": "a", "request": {"method": "GET", "url": "/a"}},
+                    {"id": "b", "request": {"url": "/b", "method": "GET"}},
+                ]
+            },
+        )
+        w = Wiremock(url=WM_URL, mappings_ttl=60)
+        found = w.mapping_by_request_exact_match(
+            {"method": "GET", "url": "/b"}
+        )
+        self.assertEqual(found["id"], "b")
+        self.assertIsNone(w.mapping_by_request_exact_match({"url": "/c"}))
+        # both lookups are served by the same retrieval
+        self.assertEqual(m.call_count, 1)
+
+    @requests_mock.Mocker()
+    def test_mappings_parsed_again_after_ttl(self, m):
+        m.get(
+            f"{ADMIN_URL}/mappings",
+            json={"mappings": [{"id": "a", "request": {"url": "/a"}}]},
+        )
+        w = Wiremock(url=WM_URL, mappings_ttl=0)
+        first = w.mappings()
+        first[0]["request"]["url"] = "/changed"
+        second = w.mappings()
+        self.assertIsNot(first, second)
+        self.assertEqual(second[0]["request"]["url"], "/a")
+
+    @requests_mock.Mocker()
+    def test_add_mapping_assigns_id(self, m):
+        m.post(
+            f"{ADMIN_URL}/mappings",
+            status_code=201,
+            json=lambda request, context: json.loads(request.body),
+        )
+        w = Wiremock(url=WM_URL)
+        mapping = {"request": {"url": "/a"}}
+        stub_id = w.add_mapping(mapping)
+        self.assertTrue(stub_id)
+        self.assertEqual(m.last_request.json()["id"], stub_id)
+        self.assertNotIn("id", mapping)
+        self.assertEqual(w.add_mapping({"id": "kept"}), "kept")
+
+    @requests_mock.Mocker()
+    def test_timeout_override(self, m):
+        mapping = {"id": "a", "request": {"url": "/a"}, "response": {}}
+        m.get(f"{ADMIN_URL}/mappings", json={"mappings": [mapping]})
+        m.put(f"{ADMIN_URL}/mappings/a", json={"id": "a"})
+        w = Wiremock(url=WM_URL)
+        w.random_delays([{"url": "/a"}], {"type": "uniform"}, timeout=0.5)
+        self.assertEqual([r.timeout for r in m.request_history], [0.5, 0.5])
+
+    @requests_mock.Mocker()
+    def test_update_status_code_as_int(self, m):
+        m.post(f"{ADMIN_URL}/mappings/import")
+        w = Wiremock(url=WM_URL)
+        for status_code in ("503", 503):
+            mappings = [{"id": "a", "response": {"status": 200}}]
+            ids = w.update_status_code_and_body(mappings, status_code)
+            self.assertEqual(ids, ["a"])
+            stub = m.last_request.json()["mappings"][0]
+            self.assertEqual(stub["response"]["status"], 503)
+            self.assertIsInstance(stub["response"]["status"], int)
+
+        calls = m.call_count
+        for status_code in (None, "abc"):
+            mappings = [{"id": "a", "response": {"status": 200}}]
+            self.assertIsNone(
+                w.update_status_code_and_body(mappings, status_code)
+            )
+        self.assertEqual(m.call_count, calls)
+
+    def _mock_delayed_mappings(self, m):
+        m.get(
+            f"{ADMIN_URL}/mappings",
+            json={
+                "mappings": [
+                    {
+                        "id": "a",
+                        "request": {"url": "/a"},
+                        "response": {"fixedDelayMilliseconds": 100},
+                    },
+                    {"id": "b", "request": {"url": "/b"}, "response": {}},
+                ]
+            },
+        )
+
+    @requests_mock.Mocker()
+    def test_up_imports_only_delayed_mappings(self, m):
+        self._mock_delayed_mappings(m)
+        m.post(f"{ADMIN_URL}/mappings/import")
+        w = Wiremock(url=WM_URL)
+        ids = w.up([{"url": "/a"}, {"url": "/b"}])
+        self.assertEqual(ids, ["a", "b"])
+        imports = [r for r in m.request_history if r.method == "POST"]
+        self.assertEqual(len(imports), 1)
+        stubs = imports[0].json()["mappings"]
+        self.assertEqual([stub["id"] for stub in stubs], ["a"])
+        self.assertNotIn("fixedDelayMilliseconds", stubs[0]["response"])
+
+    @requests_mock.Mocker()
+    def test_up_without_delays(self, m):
+        self._mock_delayed_mappings(m)
+        m.post(f"{ADMIN_URL}/mappings/import")
+        w = Wiremock(url=WM_URL)
+        self.assertEqual(w.up([{"url": "/b"}]), ["b"])
+        self.assertEqual(
+            [r.method for r in m.request_history if r.method == "POST"], []
+        )
+
+    @requests_mock.Mocker()
+    def test_up_import_error(self, m):
+        self._mock_delayed_mappings(m)
+        m.post(f"{ADMIN_URL}/mappings/import", status_code=500)
+        w = Wiremock(url=WM_URL)
+        self.assertEqual(w.up([{"url": "/a"}]), [])
+
+    @requests_mock.Mocker()
+    def test_populate_empty(self, m):
+        w = Wiremock(url=WM_URL)
+        self.assertEqual(w.populate([]), [])
+        self.assertFalse(m.called)
+
+    @requests_mock.Mocker()
+    def test_populate_from_dir_not_a_directory(self, m):
+        w = Wiremock(url=WM_URL)
+        with tempfile.NamedTemporaryFile(suffix=".json") as file:
+            self.assertIsNone(w.populate_from_dir(file.name))
+        self.assertFalse(m.called)
+
+    @requests_mock.Mocker()
+    def test_mapping_by_request_exact_match_index_miss(self, m):
+        m.get(
+            f"{ADMIN_URL}/mappings",
+            json={
+                "mappings": [
+                    {"id": "a", "request": {"method": "GET", "url": "/a"}},
+                    {
+                        "id": "b",
+                        "request": {"method": "GET", "url": "/b", "port": 1},
+                    },
+                ]
+            },
+        )
+        w = Wiremock(url=WM_URL, mappings_ttl=60)
+        found = w.mapping_by_request_exact_match(
+            {"port": 1.0, "url": "/b", "method": "GET"}
+        )
+        self.assertEqual(found["id"], "b")
+        self.assertIsNone(
+            w.mapping_by_request_exact_match({"url": "/c", "method": "GET"})
+        )
+        self.assertIsNone(w.mapping_by_request_exact_match({"url": object()}))
+        self.assertEqual(m.call_count, 1)